@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Serialization micro-benchmark for the Health Symptom Checker API
+
+Compares, per endpoint, FastAPI's default path (jsonable_encoder + json.dumps
+via JSONResponse) against the orjson / pre-encoded fragment path in main.py.
+
+Usage:
+    python bench_serialization.py [iterations]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+# main.py requires an API key at import time; no request is ever sent here
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main
+
+AI_INSIGHTS = "• Rest and stay hydrated\n• Monitor your symptoms\n• Consult a healthcare professional"
+SESSION_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _default_render(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def _assessment_payload(recommendations):
+    recommendations_dict = main._recommendation_fields(recommendations)
+    recommendations_dict["ai_insights"] = AI_INSIGHTS
+    recommendations_dict["ai_throttled"] = False
+    return {
+        "session_id": SESSION_ID,
+        "assessment_complete": True,
+        "recommendations": recommendations_dict
+    }
+
+
+def build_cases():
+    """Return (name, default_fn, fast_fn) triples for each endpoint"""
+    root_payload = {
+        "message": "Health Symptom Checker API",
+        "version": "1.0.0",
+        "disclaimer": "This API provides preliminary health guidance only and is not a substitute for professional medical advice."
+    }
+    symptoms_payload = {
+        "symptoms": [
+            {"key": key, "name": s.name, "description": f"Assessment for {s.name.lower()}"}
+            for key, s in main.SYMPTOM_DATABASE.items()
+        ]
+    }
+    questions_payload = main._symptom_questions_payload("chest_pain", main.SYMPTOM_DATABASE["chest_pain"])
+    routine = main.generate_recommendations("headache", {"severity": "mild", "onset": "gradual"})
+    emergency = main.generate_recommendations("chest_pain", {"severity": "severe"})
+
+    return [
+        ("GET /",
+         lambda: _default_render(root_payload),
+         lambda: main.RawJSONResponse(main.ROOT_PAYLOAD).body),
+        ("GET /api/symptoms",
+         lambda: _default_render(symptoms_payload),
+         lambda: main.RawJSONResponse(main.SYMPTOMS_PAYLOAD).body),
+        ("GET /api/symptoms/{key}",
+         lambda: _default_render(questions_payload),
+         lambda: main.RawJSONResponse(main.SYMPTOM_QUESTIONS_PAYLOADS["chest_pain"]).body),
+        ("POST /api/assessment/complete (routine)",
+         lambda: _default_render(_assessment_payload(routine)),
+         lambda: main.RawJSONResponse(main.render_assessment(SESSION_ID, routine, AI_INSIGHTS)).body),
+        ("POST /api/assessment/complete (emergency)",
+         lambda: _default_render(_assessment_payload(emergency)),
+         lambda: main.RawJSONResponse(main.render_assessment(SESSION_ID, emergency, AI_INSIGHTS)).body),
+    ]
+
+
+def run(iterations: int):
+    print(f"{'endpoint':<44}{'default µs':>12}{'fast µs':>10}{'speedup':>9}")
+    print("-" * 75)
+    for name, default_fn, fast_fn in build_cases():
+        # Both paths must produce the same document
+        assert json.loads(default_fn()) == json.loads(fast_fn()), name
+        default_us = timeit.timeit(default_fn, number=iterations) / iterations * 1e6
+        fast_us = timeit.timeit(fast_fn, number=iterations) / iterations * 1e6
+        print(f"{name:<44}{default_us:>12.2f}{fast_us:>10.2f}{default_us / fast_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
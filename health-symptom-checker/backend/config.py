@@ -18,3 +18,45 @@ API_PORT = int(os.getenv("PORT", os.getenv("API_PORT", "8000")))
 
 # CORS Configuration - Allow all origins for deployment
 ALLOWED_ORIGINS = ["*"]  # Allow all origins temporarily for testing
+
+# How long browsers may cache CORS preflight responses (seconds; browsers cap this)
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "86400"))
+
+# Response compression: bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+# Server: "uvicorn" (HTTP/1.1) or "hypercorn" (HTTP/2 via TLS ALPN or h2c)
+SERVER = os.getenv("SERVER", "uvicorn")
+KEEP_ALIVE_TIMEOUT = int(os.getenv("KEEP_ALIVE_TIMEOUT", "75"))
+SSL_CERTFILE = os.getenv("SSL_CERTFILE")
+SSL_KEYFILE = os.getenv("SSL_KEYFILE")
+
+# Rate limiting for LLM-backed endpoints (token bucket: sustained rate per minute + burst)
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "20"))
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", "10"))
+RATE_LIMIT_SESSION_PER_MINUTE = float(os.getenv("RATE_LIMIT_SESSION_PER_MINUTE", "6"))
+RATE_LIMIT_SESSION_BURST = int(os.getenv("RATE_LIMIT_SESSION_BURST", "3"))
+
+# Number of reverse proxies in front of the app that append to X-Forwarded-For.
+# 0 (default) ignores the header and keys clients by socket peer address.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+# Shared limiter state for multi-worker deployments (in-process when unset)
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Admission control for in-flight LLM calls (per worker)
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+
+# Append-only assessment event log (set EVENT_LOG_DIR to an empty value to disable)
+EVENT_LOG_DIR = os.getenv("EVENT_LOG_DIR", "event_log")
+EVENT_LOG_SEGMENT_MB = int(os.getenv("EVENT_LOG_SEGMENT_MB", "64"))
+
+# Event-loop health monitoring
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+
+# Expose /api/debug/* endpoints (stack samples include source paths)
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true"
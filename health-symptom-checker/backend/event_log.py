@@ -0,0 +1,371 @@
+"""
+Append-only assessment event log
+
+Request handlers only append a tuple to an in-memory buffer. A background
+task flushes the buffer in batches on a worker thread, packing each event
+into a fixed-width binary record, so logging never touches request latency.
+
+Each worker appends to its own segment file. Segments are rotated by size
+and start with a header holding the codebook used to encode symptoms and
+answers, which keeps records small (a few dozen bytes) and lets offline
+tools load millions of them straight into NumPy arrays.
+"""
+
+import asyncio
+import json
+import math
+import os
+import struct
+import time
+from typing import Any, Dict, List, Optional
+
+SEGMENT_MAGIC = b"HSCEVT3\n"
+SEGMENT_SUFFIX = ".seg"
+ACTIVE_SUFFIX = ".open"
+
+# Event types (the dictionary for the `event` column). Only completed
+# assessments are logged: individual answers arrive before the symptom is
+# known and could not be attributed to one.
+EVENT_TYPES = ["assessment"]
+EVENT_ASSESSMENT = 0
+
+URGENCY_LEVELS = ["LOW", "MEDIUM", "HIGH", "EMERGENCY"]
+
+# What happened to the LLM call for an assessment. Latency is only recorded
+# for "ok"; no call at all (e.g. a cache hit) is CODE_MISSING.
+LLM_OUTCOMES = ["ok", "error", "throttled", "shed"]
+
+# Reserved codes for categorical fields
+CODE_OTHER = 254    # value not present in the codebook
+CODE_MISSING = 255  # no value (question not answered, no urgency, ...)
+
+
+class AssessmentCodebook:
+    """Maps symptom keys and answer values to the small integer codes stored in records"""
+
+    def __init__(self, symptoms: List[str], questions: Dict[str, List[str]]):
+        if len(symptoms) >= CODE_OTHER or any(len(v) >= CODE_OTHER for v in questions.values()):
+            raise ValueError("Codebook too large for single-byte codes")
+        self.symptoms = list(symptoms)
+        self.questions = {qid: list(values) for qid, values in questions.items()}
+        self._symptom_codes = {key: i for i, key in enumerate(self.symptoms)}
+        self._answer_codes = {
+            qid: {value: i for i, value in enumerate(values)}
+            for qid, values in self.questions.items()
+        }
+        self._urgency_codes = {level: i for i, level in enumerate(URGENCY_LEVELS)}
+        self._outcome_codes = {outcome: i for i, outcome in enumerate(LLM_OUTCOMES)}
+        # ts, event, symptom, one code per question, urgency, is_emergency, cache_hit,
+        # llm_outcome, llm_latency_ms
+        self.record = struct.Struct("<dBB" + "B" * len(self.questions) + "BBBBf")
+
+    @classmethod
+    def from_database(cls, symptom_database: Dict[str, Any]) -> "AssessmentCodebook":
+        """Build a codebook from SYMPTOM_DATABASE, in declaration order"""
+        questions: Dict[str, List[str]] = {}
+        for symptom in symptom_database.values():
+            for question in symptom.questions:
+                values = questions.setdefault(question.id, [])
+                for option in question.options:
+                    if option.value not in values:
+                        values.append(option.value)
+        return cls(list(symptom_database), questions)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symptoms": self.symptoms,
+            "questions": self.questions,
+            "urgency_levels": URGENCY_LEVELS,
+            "llm_outcomes": LLM_OUTCOMES
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AssessmentCodebook":
+        return cls(data["symptoms"], data["questions"])
+
+    def encode(self, event: tuple) -> bytes:
+        (timestamp, kind, symptom_key, responses, urgency_level, is_emergency, cache_hit,
+         llm_outcome, llm_latency_ms) = event
+        answers = [
+            CODE_MISSING if qid not in responses else codes.get(responses[qid], CODE_OTHER)
+            for qid, codes in self._answer_codes.items()
+        ]
+        return self.record.pack(
+            timestamp,
+            kind,
+            CODE_MISSING if symptom_key is None else self._symptom_codes.get(symptom_key, CODE_OTHER),
+            *answers,
+            CODE_MISSING if urgency_level is None else self._urgency_codes.get(urgency_level, CODE_OTHER),
+            int(is_emergency),
+            int(cache_hit),
+            CODE_MISSING if llm_outcome is None else self._outcome_codes.get(llm_outcome, CODE_OTHER),
+            math.nan if llm_latency_ms is None else llm_latency_ms
+        )
+
+
+class AssessmentEventLog:
+    """Buffered, append-only log of assessment events"""
+
+    def __init__(
+        self,
+        directory: str,
+        codebook: AssessmentCodebook,
+        batch_size: int = 1024,
+        flush_interval: float = 1.0,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        max_buffered: int = 100000
+    ):
+        self.directory = directory
+        self.codebook = codebook
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_max_bytes = segment_max_bytes
+        self.max_buffered = max_buffered
+        self.dropped = 0
+        self._buffer: List[tuple] = []
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._segment = None
+        self._segment_path: Optional[str] = None
+
+    # Producer side: called from request handlers, never blocks
+
+    def _append(self, event: tuple):
+        if len(self._buffer) >= self.max_buffered:
+            # Shed events rather than grow without bound if the disk falls behind
+            self.dropped += 1
+            return
+        self._buffer.append(event)
+        if len(self._buffer) >= self.batch_size and self._batch_ready is not None:
+            self._batch_ready.set()
+
+    def record_assessment(
+        self,
+        symptom_key: str,
+        responses: Dict[str, str],
+        urgency_level: str,
+        is_emergency: bool,
+        llm_outcome: Optional[str],
+        llm_latency_ms: Optional[float],
+        cache_hit: bool = False
+    ):
+        self._append((
+            time.time(), EVENT_ASSESSMENT, symptom_key, dict(responses),
+            urgency_level, is_emergency, cache_hit, llm_outcome, llm_latency_ms
+        ))
+
+    # Consumer side: background flushing
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            await asyncio.to_thread(finalize_stale_segments, self.directory)
+        except OSError as e:
+            print(f"Event log could not finalize stale segments: {e}")
+        self._batch_ready = asyncio.Event()
+        self._stopping = False
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Drain the buffer and close the active segment"""
+        if self._flusher is None:
+            return
+        self._stopping = True
+        self._batch_ready.set()
+        await self._flusher
+        self._flusher = None
+        await asyncio.to_thread(self._close_segment)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Event log flush error: {e}")
+            if self._stopping:
+                return
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: List[tuple]):
+        if self._segment is None:
+            self._open_segment()
+        self._segment.write(b"".join(self.codebook.encode(event) for event in batch))
+        self._segment.flush()
+        if self._segment.tell() >= self.segment_max_bytes:
+            self._close_segment()
+
+    def _open_segment(self):
+        name = f"{time.time_ns():020d}-{os.getpid()}"
+        self._segment_path = os.path.join(self.directory, name + ACTIVE_SUFFIX)
+        self._segment = open(self._segment_path, "ab")
+        header = _encode_header(self.codebook)
+        self._segment.write(SEGMENT_MAGIC + struct.pack("<I", len(header)) + header)
+
+    def _close_segment(self):
+        if self._segment is None:
+            return
+        self._segment.close()
+        os.replace(self._segment_path, self._segment_path[:-len(ACTIVE_SUFFIX)] + SEGMENT_SUFFIX)
+        self._segment = None
+        self._segment_path = None
+
+    def stats(self) -> dict:
+        return {"buffered": len(self._buffer), "dropped": self.dropped}
+
+
+def _encode_header(codebook: AssessmentCodebook) -> bytes:
+    return json.dumps(codebook.to_dict(), separators=(",", ":")).encode()
+
+
+# Offline reading (requires numpy)
+
+def segment_dtype(codebook: AssessmentCodebook):
+    """NumPy structured dtype matching the packed record layout"""
+    import numpy as np
+    return np.dtype(
+        [("timestamp", "<f8"), ("event", "u1"), ("symptom", "u1")]
+        + [(f"answer_{qid}", "u1") for qid in codebook.questions]
+        + [("urgency", "u1"), ("is_emergency", "u1"), ("cache_hit", "u1"),
+           ("llm_outcome", "u1"), ("llm_latency_ms", "<f4")]
+    )
+
+
+def _read_header(f) -> AssessmentCodebook:
+    """Read a segment header, leaving `f` positioned at the first record"""
+    prefix = f.read(len(SEGMENT_MAGIC) + 4)
+    if len(prefix) < len(SEGMENT_MAGIC) + 4 or not prefix.startswith(SEGMENT_MAGIC):
+        raise ValueError(f"Not an event log segment: {f.name}")
+    (header_len,) = struct.unpack_from("<I", prefix, len(SEGMENT_MAGIC))
+    header = f.read(header_len)
+    if len(header) < header_len:
+        raise ValueError(f"Truncated event log segment header: {f.name}")
+    return AssessmentCodebook.from_dict(json.loads(header))
+
+
+def read_segment(path: str):
+    """Load one segment as (codebook, structured NumPy array)"""
+    import numpy as np
+
+    with open(path, "rb") as f:
+        codebook = _read_header(f)
+        data = f.read()
+
+    dtype = segment_dtype(codebook)
+    # An active segment may end mid-batch; only whole records are read
+    return codebook, np.frombuffer(data, dtype=dtype, count=len(data) // dtype.itemsize)
+
+
+def _pid_running(pid: int) -> bool:
+    if os.name != "posix":
+        return True  # no cheap liveness check; leave the segment alone
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def finalize_stale_segments(directory: str) -> List[str]:
+    """Close `.open` segments left behind by workers that are no longer running.
+
+    A killed worker never renames its active segment, which would otherwise
+    hide its events from the exporter. Each stale segment is truncated to
+    whole records (a kill can land mid-write) and renamed to `.seg`. Returns
+    the finalized paths.
+    """
+    finalized = []
+    for name in os.listdir(directory):
+        if not name.endswith(ACTIVE_SUFFIX):
+            continue
+        try:
+            pid = int(name[:-len(ACTIVE_SUFFIX)].rsplit("-", 1)[1])
+        except (IndexError, ValueError):
+            continue
+        # This process has no segment open yet when the log starts, so a
+        # match on our own PID is a leftover from a recycled PID
+        if pid != os.getpid() and _pid_running(pid):
+            continue
+
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r+b") as f:
+                codebook = _read_header(f)
+                offset = f.tell()
+                size = os.fstat(f.fileno()).st_size
+                f.truncate(offset + (size - offset) // codebook.record.size * codebook.record.size)
+            os.replace(path, path[:-len(ACTIVE_SUFFIX)] + SEGMENT_SUFFIX)
+        except FileNotFoundError:
+            continue  # finalized concurrently by another worker
+        except ValueError as e:
+            print(f"Skipping unreadable event log segment: {e}")
+            continue
+        finalized.append(path)
+    return finalized
+
+
+def list_segments(directory: str, include_active: bool = False) -> List[str]:
+    """Finalized segment paths in write order, plus active `.open` segments if include_active"""
+    suffixes = (SEGMENT_SUFFIX, ACTIVE_SUFFIX) if include_active else (SEGMENT_SUFFIX,)
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(suffixes)
+    )
+
+
+def load_columns(directory: str, include_active: bool = False):
+    """Load every segment in `directory` into columns of NumPy arrays.
+
+    Segments written with different codebooks (e.g. after SYMPTOM_DATABASE
+    changed) are re-coded against a merged codebook. Returns
+    (codebook, {column name: array}).
+    """
+    import numpy as np
+
+    segments = [read_segment(path) for path in list_segments(directory, include_active)]
+
+    symptoms: List[str] = []
+    questions: Dict[str, List[str]] = {}
+    for codebook, _ in segments:
+        symptoms.extend(s for s in codebook.symptoms if s not in symptoms)
+        for qid, values in codebook.questions.items():
+            merged = questions.setdefault(qid, [])
+            merged.extend(v for v in values if v not in merged)
+    merged_codebook = AssessmentCodebook(symptoms, questions)
+
+    def remap(values: List[str], merged: List[str]):
+        # Lookup table from segment codes to merged codes; reserved codes map to themselves
+        table = np.arange(256, dtype=np.uint8)
+        table[:len(values)] = [merged.index(v) for v in values]
+        return table
+
+    parts: Dict[str, list] = {name: [] for name in segment_dtype(merged_codebook).names}
+    for codebook, records in segments:
+        for name in ("timestamp", "event", "urgency", "is_emergency", "cache_hit", "llm_outcome", "llm_latency_ms"):
+            parts[name].append(records[name])
+        parts["symptom"].append(remap(codebook.symptoms, symptoms)[records["symptom"]])
+        for qid in questions:
+            column = f"answer_{qid}"
+            if qid in codebook.questions:
+                parts[column].append(remap(codebook.questions[qid], questions[qid])[records[column]])
+            else:
+                parts[column].append(np.full(len(records), CODE_MISSING, dtype=np.uint8))
+
+    columns = {
+        name: np.concatenate(arrays) if arrays else np.empty(0, dtype=segment_dtype(merged_codebook)[name])
+        for name, arrays in parts.items()
+    }
+    return merged_codebook, columns
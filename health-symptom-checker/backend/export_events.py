@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Export the assessment event log to a columnar file for offline analysis
+
+Writes NumPy arrays (.npz, requires numpy) or Parquet (.parquet, also
+requires pyarrow). Categorical columns are exported as small integer codes
+with their dictionaries (NumPy) or as dictionary-encoded columns (Parquet).
+
+Usage:
+    python export_events.py events.parquet [--dir event_log] [--include-active]
+    python export_events.py events.npz
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from event_log import EVENT_TYPES, LLM_OUTCOMES, URGENCY_LEVELS, load_columns
+
+
+def export_npz(path: str, codebook, columns):
+    import numpy as np
+    np.savez_compressed(path, codebook=np.array(json.dumps(codebook.to_dict())), **columns)
+
+
+def export_parquet(path: str, codebook, columns):
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def categorical(codes, values):
+        # Codes outside the dictionary (missing / unrecognized answers) become nulls
+        mask = codes >= len(values)
+        indices = pa.array(np.where(mask, 0, codes).astype(np.int16), mask=mask)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string()))
+
+    latency = columns["llm_latency_ms"]
+    table = pa.table({
+        "timestamp": pa.array((columns["timestamp"] * 1e6).astype("int64"), type=pa.timestamp("us")),
+        "event": categorical(columns["event"], EVENT_TYPES),
+        "symptom_key": categorical(columns["symptom"], codebook.symptoms),
+        **{
+            qid: categorical(columns[f"answer_{qid}"], values)
+            for qid, values in codebook.questions.items()
+        },
+        "urgency_level": categorical(columns["urgency"], URGENCY_LEVELS),
+        "is_emergency": pa.array(columns["is_emergency"].astype(bool)),
+        "cache_hit": pa.array(columns["cache_hit"].astype(bool)),
+        "llm_outcome": categorical(columns["llm_outcome"], LLM_OUTCOMES),
+        "llm_latency_ms": pa.array(latency, mask=np.isnan(latency)),
+    })
+    pq.write_table(table, path, compression="zstd")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export assessment events to a columnar file")
+    parser.add_argument("output", help="Output path ending in .parquet or .npz")
+    parser.add_argument("--dir", default="event_log", help="Event log directory")
+    parser.add_argument("--include-active", action="store_true",
+                        help="Also read segments still being written by running workers")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    codebook, columns = load_columns(args.dir, args.include_active)
+    loaded = time.perf_counter()
+
+    if args.output.endswith(".parquet"):
+        export_parquet(args.output, codebook, columns)
+    elif args.output.endswith(".npz"):
+        export_npz(args.output, codebook, columns)
+    else:
+        sys.exit("Output must end in .parquet or .npz")
+
+    print(f"Loaded {len(columns['timestamp'])} assessment events in {loaded - started:.2f}s; "
+          f"wrote {args.output} in {time.perf_counter() - loaded:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Event-loop health monitor
+
+A sampler task sleeps for a fixed interval and records how late it wakes up
+(event-loop lag). A watchdog thread checks the sampler's heartbeat; when the
+loop has been stuck for longer than the threshold, it grabs the loop
+thread's current stack with sys._current_frames(), so the blocking call
+site is captured while it is still running. Both run a few times per second,
+so the monitor is cheap enough to leave enabled in production.
+"""
+
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class EventLoopMonitor:
+    """Samples event-loop lag and records the call sites that block the loop"""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.1,
+        window: int = 2048,
+        source_root: Optional[str] = None,
+        max_sites: int = 100
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.source_root = os.path.abspath(source_root or os.path.dirname(__file__))
+        # A virtualenv inside the source tree must not count as our own code
+        self._library_roots = tuple(
+            os.path.join(os.path.abspath(path), "")
+            for name, path in sysconfig.get_paths().items()
+            if name in ("stdlib", "platstdlib", "purelib", "platlib")
+        )
+        self.max_sites = max_sites
+        self.blocking_events = 0
+        self._lags = deque(maxlen=window)
+        self._sites: Dict[str, dict] = {}
+        self._heartbeat = time.monotonic()
+        self._pending = None
+        self._loop_thread_id: Optional[int] = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._sampler = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _sample(self):
+        while True:
+            heartbeat = time.monotonic()
+            self._heartbeat = heartbeat
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - heartbeat - self.interval)
+            self._lags.append(lag)
+
+            if lag >= self.block_threshold:
+                self.blocking_events += 1
+                pending = self._pending
+                if pending is not None and pending[0] == heartbeat:
+                    self._pending = None
+                    self._record_block(pending[1], pending[2], lag)
+                else:
+                    # Blocked, but too briefly for the watchdog to catch it in the act
+                    self._record_block("<not captured>", [], lag)
+
+    def _watch(self):
+        check_every = min(self.interval, self.block_threshold) / 2
+        while not self._stopped.wait(check_every):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < self.interval + self.block_threshold:
+                continue
+            pending = self._pending
+            if pending is not None and pending[0] == heartbeat:
+                continue  # Already captured this stall
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            self._pending = (heartbeat, self._call_site(stack), traceback.format_list(stack[-12:]))
+
+    def _is_own_source(self, filename: str) -> bool:
+        filename = os.path.abspath(filename)
+        parts = filename.split(os.sep)
+        return (
+            filename.startswith(os.path.join(self.source_root, ""))
+            and not filename.startswith(self._library_roots)
+            and "site-packages" not in parts
+            and "dist-packages" not in parts
+            and not filename.endswith("loop_monitor.py")
+        )
+
+    def _call_site(self, stack: traceback.StackSummary) -> str:
+        """Innermost frame in our own source, else the innermost frame overall.
+
+        Sites are reported by /api/health, so frames outside our source are
+        named by function only; their paths appear in the debug-only stacks.
+        """
+        for frame in reversed(stack):
+            if self._is_own_source(frame.filename):
+                return f"{os.path.relpath(frame.filename, self.source_root)}:{frame.lineno} in {frame.name}"
+        return f"<library> in {stack[-1].name}"
+
+    def _record_block(self, site: str, stack: List[str], duration: float):
+        entry = self._sites.get(site)
+        if entry is None:
+            if len(self._sites) >= self.max_sites:
+                return
+            entry = self._sites[site] = {"site": site, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stack}
+        entry["count"] += 1
+        entry["total_ms"] += duration * 1000
+        if duration * 1000 >= entry["max_ms"]:
+            entry["max_ms"] = duration * 1000
+            if stack:
+                entry["stack"] = stack
+
+    def lag_percentiles(self) -> Dict[str, float]:
+        lags = sorted(self._lags)
+        if not lags:
+            return {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        def at(fraction: float) -> float:
+            return round(lags[min(len(lags) - 1, int(fraction * len(lags)))] * 1000, 3)
+
+        return {"p50_ms": at(0.50), "p90_ms": at(0.90), "p99_ms": at(0.99), "max_ms": round(lags[-1] * 1000, 3)}
+
+    def top_blocking_sites(self, limit: int = 10, include_stack: bool = False) -> List[dict]:
+        sites = sorted(self._sites.values(), key=lambda s: s["total_ms"], reverse=True)[:limit]
+        return [
+            {
+                "site": s["site"],
+                "count": s["count"],
+                "total_ms": round(s["total_ms"], 3),
+                "max_ms": round(s["max_ms"], 3),
+                **({"stack": s["stack"]} if include_stack else {})
+            }
+            for s in sites
+        ]
+
+    def stats(self, limit: int = 3, include_stack: bool = False) -> dict:
+        return {
+            "lag": self.lag_percentiles(),
+            "samples": len(self._lags),
+            "blocking_events": self.blocking_events,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "top_blocking_sites": self.top_blocking_sites(limit, include_stack)
+        }
@@ -1,31 +1,115 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import uuid
 import json
+import math
+import time
 import openai
-from config import OPENAI_API_KEY, OPENAI_MODEL, API_HOST, API_PORT, ALLOWED_ORIGINS
+from config import (
+    OPENAI_API_KEY, OPENAI_MODEL, API_HOST, API_PORT, ALLOWED_ORIGINS,
+    CORS_MAX_AGE, COMPRESSION_MIN_BYTES,
+    RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_IP_BURST,
+    RATE_LIMIT_SESSION_PER_MINUTE, RATE_LIMIT_SESSION_BURST,
+    TRUSTED_PROXY_HOPS, REDIS_URL, LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT,
+    EVENT_LOG_DIR, EVENT_LOG_SEGMENT_MB,
+    LOOP_MONITOR_ENABLED, LOOP_MONITOR_INTERVAL_MS, LOOP_BLOCK_THRESHOLD_MS, DEBUG_ENDPOINTS
+)
+from event_log import AssessmentCodebook, AssessmentEventLog
+from loop_monitor import EventLoopMonitor
+from rate_limit import AdmissionController, Overloaded, RateLimiter, create_token_bucket_store
+from compression import CompressionMiddleware
+from serialization import RawJSONResponse, encode, encode_items, encode_list, open_object
 
 # Initialize OpenAI client
-openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+openai_client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 app = FastAPI(
     title="Health Symptom Checker API",
     description="A preliminary health assessment tool for symptom checking",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Configure CORS for React frontend
+# Configure CORS for React frontend; preflights are cacheable for CORS_MAX_AGE
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
+    max_age=CORS_MAX_AGE,
 )
 
+# Compress larger responses (brotli when available, else gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+# Event-loop lag sampling and blocking-call detection
+loop_monitor: Optional[EventLoopMonitor] = None
+if LOOP_MONITOR_ENABLED:
+    loop_monitor = EventLoopMonitor(
+        interval=LOOP_MONITOR_INTERVAL_MS / 1000,
+        block_threshold=LOOP_BLOCK_THRESHOLD_MS / 1000
+    )
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    if loop_monitor is not None:
+        await loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+
+# Rate limiting and admission control for LLM-backed endpoints
+rate_limit_store = create_token_bucket_store(REDIS_URL)
+ip_rate_limiter = RateLimiter(rate_limit_store, "ip", RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_IP_BURST)
+session_rate_limiter = RateLimiter(rate_limit_store, "session", RATE_LIMIT_SESSION_PER_MINUTE, RATE_LIMIT_SESSION_BURST)
+llm_admission = AdmissionController(LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT)
+
+AI_UNAVAILABLE_MESSAGE = "Unable to generate AI recommendations at this time. Please consult with a healthcare professional."
+
+def get_client_ip(http_request: Request) -> str:
+    """Client address for rate limiting.
+
+    With TRUSTED_PROXY_HOPS = N, the N rightmost X-Forwarded-For entries were
+    appended by our own proxies; the client is the entry just before them
+    (the peer is the last proxy). Entries further left are client-supplied
+    and ignored. Without trusted proxies the header is ignored entirely.
+    """
+    peer = http_request.client.host if http_request.client else "unknown"
+    if TRUSTED_PROXY_HOPS <= 0:
+        return peer
+    
+    forwarded_for = http_request.headers.get("x-forwarded-for", "")
+    hops = [peer] + [entry.strip() for entry in reversed(forwarded_for.split(",")) if entry.strip()]
+    return hops[min(TRUSTED_PROXY_HOPS, len(hops) - 1)]
+
+def retry_after_headers(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+def too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many requests, please try again later",
+        headers=retry_after_headers(retry_after)
+    )
+
+async def llm_retry_after(http_request: Request, session_id: str) -> float:
+    """Seconds until this client and session may make another LLM call (0 if allowed now)
+
+    The session bucket is only charged once the IP bucket admits the call, so
+    a throttled client does not also drain its session's tokens.
+    """
+    retry_after = await ip_rate_limiter.check(get_client_ip(http_request))
+    if retry_after > 0:
+        return retry_after
+    return await session_rate_limiter.check(session_id)
+
 # Pydantic models for request/response
 class SymptomOption(BaseModel):
     value: str
@@ -46,6 +130,10 @@ class UserResponse(BaseModel):
     question_id: str
     answer: str
 
+class AnswerBatch(BaseModel):
+    session_id: str
+    responses: Dict[str, str]
+
 class AssessmentRequest(BaseModel):
     session_id: str
     symptom_key: str
@@ -57,6 +145,10 @@ class RecommendationResponse(BaseModel):
     is_emergency: bool
     follow_up_actions: List[str]
 
+    class Config:
+        # EMERGENCY_RECOMMENDATION is shared and pre-encoded, so instances must not change
+        frozen = True
+
 class SessionData(BaseModel):
     session_id: str
     symptom_key: Optional[str] = None
@@ -244,6 +336,25 @@ SYMPTOM_DATABASE = {
     )
 }
 
+# Assessment event log for offline analytics (flushed off the event loop)
+event_log: Optional[AssessmentEventLog] = None
+if EVENT_LOG_DIR:
+    event_log = AssessmentEventLog(
+        EVENT_LOG_DIR,
+        AssessmentCodebook.from_database(SYMPTOM_DATABASE),
+        segment_max_bytes=EVENT_LOG_SEGMENT_MB * 1024 * 1024
+    )
+
+@app.on_event("startup")
+async def start_event_log():
+    if event_log is not None:
+        await event_log.start()
+
+@app.on_event("shutdown")
+async def stop_event_log():
+    if event_log is not None:
+        await event_log.stop()
+
 # Emergency detection function
 def detect_emergency(symptom_key: str, responses: Dict[str, str]) -> bool:
     """Detect if any response indicates an emergency situation"""
@@ -286,7 +397,7 @@ async def get_openai_recommendations(symptom_key: str, responses: Dict[str, str]
         Format the response in a clear, easy-to-read manner with bullet points.
         """
         
-        response = openai_client.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": "You are a helpful medical AI assistant providing preliminary health guidance. Always emphasize that this is not a substitute for professional medical advice."},
@@ -300,7 +411,35 @@ async def get_openai_recommendations(symptom_key: str, responses: Dict[str, str]
         
     except Exception as e:
         print(f"OpenAI API error: {e}")
-        return "Unable to generate AI recommendations at this time. Please consult with a healthcare professional."
+        return AI_UNAVAILABLE_MESSAGE
+
+# Static recommendation content, shared by every response that uses it.
+# The shared instance is frozen and its lists must never be modified in place:
+# EMERGENCY_FRAGMENT below is encoded from it once.
+EMERGENCY_RECOMMENDATION = RecommendationResponse(
+    recommendations=[
+        "🚨 This appears to be a medical emergency",
+        "Call 911 immediately or go to the nearest emergency room",
+        "Do not drive yourself if symptoms are severe",
+        "Have someone accompany you if possible"
+    ],
+    urgency_level="EMERGENCY",
+    is_emergency=True,
+    follow_up_actions=[
+        "Call 911 now",
+        "Go to emergency room",
+        "Contact emergency services"
+    ]
+)
+
+GENERAL_ADVICE = [
+    "",
+    "🔄 General advice:",
+    "• Monitor your symptoms closely",
+    "• Seek medical care if symptoms worsen",
+    "• This assessment is for guidance only",
+    "• Always trust your instincts about your health"
+]
 
 # Recommendation generation
 def generate_recommendations(symptom_key: str, responses: Dict[str, str]) -> RecommendationResponse:
@@ -309,21 +448,7 @@ def generate_recommendations(symptom_key: str, responses: Dict[str, str]) -> Rec
     is_emergency = detect_emergency(symptom_key, responses)
     
     if is_emergency:
-        return RecommendationResponse(
-            recommendations=[
-                "🚨 This appears to be a medical emergency",
-                "Call 911 immediately or go to the nearest emergency room",
-                "Do not drive yourself if symptoms are severe",
-                "Have someone accompany you if possible"
-            ],
-            urgency_level="EMERGENCY",
-            is_emergency=True,
-            follow_up_actions=[
-                "Call 911 now",
-                "Go to emergency room",
-                "Contact emergency services"
-            ]
-        )
+        return EMERGENCY_RECOMMENDATION
     
     # Generate specific recommendations based on symptom and responses
     recommendations = []
@@ -469,14 +594,7 @@ def generate_recommendations(symptom_key: str, responses: Dict[str, str]) -> Rec
             ])
     
     # Add general recommendations
-    recommendations.extend([
-        "",
-        "🔄 General advice:",
-        "• Monitor your symptoms closely",
-        "• Seek medical care if symptoms worsen",
-        "• This assessment is for guidance only",
-        "• Always trust your instincts about your health"
-    ])
+    recommendations.extend(GENERAL_ADVICE)
     
     if urgency_level == "LOW":
         follow_up_actions.append("Monitor symptoms for 24-48 hours")
@@ -488,45 +606,16 @@ def generate_recommendations(symptom_key: str, responses: Dict[str, str]) -> Rec
         follow_up_actions=follow_up_actions
     )
 
-# API Endpoints
-
-@app.get("/")
-async def root():
+# Pre-encoded response fragments (encoded once at startup, never re-encoded)
+def _recommendation_fields(recommendations: RecommendationResponse) -> Dict[str, Any]:
     return {
-        "message": "Health Symptom Checker API",
-        "version": "1.0.0",
-        "disclaimer": "This API provides preliminary health guidance only and is not a substitute for professional medical advice."
+        "recommendations": recommendations.recommendations,
+        "urgency_level": recommendations.urgency_level,
+        "is_emergency": recommendations.is_emergency,
+        "follow_up_actions": recommendations.follow_up_actions
     }
 
-@app.post("/api/session/create")
-async def create_session():
-    """Create a new assessment session"""
-    session_id = str(uuid.uuid4())
-    sessions[session_id] = SessionData(
-        session_id=session_id,
-        created_at=datetime.now()
-    )
-    return {"session_id": session_id}
-
-@app.get("/api/symptoms")
-async def get_symptoms():
-    """Get available symptom categories"""
-    symptoms = []
-    for key, symptom in SYMPTOM_DATABASE.items():
-        symptoms.append({
-            "key": key,
-            "name": symptom.name,
-            "description": f"Assessment for {symptom.name.lower()}"
-        })
-    return {"symptoms": symptoms}
-
-@app.get("/api/symptoms/{symptom_key}")
-async def get_symptom_questions(symptom_key: str):
-    """Get questions for a specific symptom"""
-    if symptom_key not in SYMPTOM_DATABASE:
-        raise HTTPException(status_code=404, detail="Symptom category not found")
-    
-    symptom = SYMPTOM_DATABASE[symptom_key]
+def _symptom_questions_payload(symptom_key: str, symptom: SymptomCategory) -> Dict[str, Any]:
     return {
         "symptom_key": symptom_key,
         "name": symptom.name,
@@ -547,6 +636,120 @@ async def get_symptom_questions(symptom_key: str):
         ]
     }
 
+ROOT_PAYLOAD = encode({
+    "message": "Health Symptom Checker API",
+    "version": "1.0.0",
+    "disclaimer": "This API provides preliminary health guidance only and is not a substitute for professional medical advice."
+})
+
+SYMPTOMS_PAYLOAD = encode({
+    "symptoms": [
+        {
+            "key": key,
+            "name": symptom.name,
+            "description": f"Assessment for {symptom.name.lower()}"
+        }
+        for key, symptom in SYMPTOM_DATABASE.items()
+    ]
+})
+
+SYMPTOM_QUESTIONS_PAYLOADS = {
+    key: encode(_symptom_questions_payload(key, symptom))
+    for key, symptom in SYMPTOM_DATABASE.items()
+}
+
+# Members of the catalog object, for splicing into the bootstrap response
+SYMPTOMS_FRAGMENT = SYMPTOMS_PAYLOAD[1:-1]
+ALL_QUESTIONS_FRAGMENT = b"{" + b",".join(
+    encode(key) + b":" + payload for key, payload in SYMPTOM_QUESTIONS_PAYLOADS.items()
+) + b"}"
+
+EMERGENCY_FRAGMENT = open_object(_recommendation_fields(EMERGENCY_RECOMMENDATION))
+GENERAL_ADVICE_FRAGMENT = encode_items(GENERAL_ADVICE)
+
+def encode_recommendations(recommendations: RecommendationResponse) -> bytes:
+    """Encode recommendations as an open JSON object, reusing static fragments"""
+    if recommendations is EMERGENCY_RECOMMENDATION:
+        return EMERGENCY_FRAGMENT
+    
+    items = recommendations.recommendations
+    advice_start = len(items) - len(GENERAL_ADVICE)
+    if advice_start >= 0 and items[advice_start:] == GENERAL_ADVICE:
+        items_json = encode_list(items[:advice_start], GENERAL_ADVICE_FRAGMENT)
+    else:
+        items_json = encode(items)
+    
+    return (
+        b'{"recommendations":' + items_json
+        + b',"urgency_level":' + encode(recommendations.urgency_level)
+        + b',"is_emergency":' + encode(recommendations.is_emergency)
+        + b',"follow_up_actions":' + encode(recommendations.follow_up_actions)
+    )
+
+def render_assessment(
+    session_id: str,
+    recommendations: RecommendationResponse,
+    ai_insights: str,
+    ai_throttled: bool = False
+) -> bytes:
+    """Assemble the /api/assessment/complete response body"""
+    return (
+        b'{"session_id":' + encode(session_id)
+        + b',"assessment_complete":true,"recommendations":'
+        + encode_recommendations(recommendations)
+        + b',"ai_insights":' + encode(ai_insights)
+        + (b',"ai_throttled":true}}' if ai_throttled else b',"ai_throttled":false}}')
+    )
+
+# API Endpoints
+
+@app.get("/")
+async def root():
+    return RawJSONResponse(ROOT_PAYLOAD)
+
+def new_session() -> str:
+    session_id = str(uuid.uuid4())
+    sessions[session_id] = SessionData(
+        session_id=session_id,
+        created_at=datetime.now()
+    )
+    return session_id
+
+@app.post("/api/session/create")
+async def create_session():
+    """Create a new assessment session"""
+    return {"session_id": new_session()}
+
+@app.post("/api/session/bootstrap")
+async def bootstrap_session(symptom_key: Optional[str] = None, include_questions: bool = False):
+    """Create a session and return the symptom catalog in one round-trip.
+
+    Pass `symptom_key` to also get that category's questions, or
+    `include_questions=true` to get the questions for every category.
+    """
+    if symptom_key is not None and symptom_key not in SYMPTOM_DATABASE:
+        raise HTTPException(status_code=404, detail="Symptom category not found")
+    
+    body = b'{"session_id":' + encode(new_session()) + b"," + SYMPTOMS_FRAGMENT
+    if symptom_key is not None:
+        body += b',"symptom":' + SYMPTOM_QUESTIONS_PAYLOADS[symptom_key]
+    if include_questions:
+        body += b',"questions":' + ALL_QUESTIONS_FRAGMENT
+    return RawJSONResponse(body + b"}")
+
+@app.get("/api/symptoms")
+async def get_symptoms():
+    """Get available symptom categories"""
+    return RawJSONResponse(SYMPTOMS_PAYLOAD)
+
+@app.get("/api/symptoms/{symptom_key}")
+async def get_symptom_questions(symptom_key: str):
+    """Get questions for a specific symptom"""
+    if symptom_key not in SYMPTOM_DATABASE:
+        raise HTTPException(status_code=404, detail="Symptom category not found")
+    
+    return RawJSONResponse(SYMPTOM_QUESTIONS_PAYLOADS[symptom_key])
+
 @app.post("/api/assessment/answer")
 async def submit_answer(response: UserResponse):
     """Submit an answer to a question"""
@@ -562,8 +765,23 @@ async def submit_answer(response: UserResponse):
         "message": "Answer recorded successfully"
     }
 
+@app.post("/api/assessment/answers")
+async def submit_answers(batch: AnswerBatch):
+    """Submit several answers at once (optional: /api/assessment/complete accepts all answers)"""
+    if batch.session_id not in sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    session = sessions[batch.session_id]
+    session.responses.update(batch.responses)
+    
+    return {
+        "session_id": batch.session_id,
+        "responses_count": len(session.responses),
+        "message": "Answers recorded successfully"
+    }
+
 @app.post("/api/assessment/complete")
-async def complete_assessment(request: AssessmentRequest):
+async def complete_assessment(request: AssessmentRequest, http_request: Request):
     """Complete assessment and get recommendations"""
     if request.session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -580,18 +798,51 @@ async def complete_assessment(request: AssessmentRequest):
     # Generate base recommendations
     recommendations = generate_recommendations(request.symptom_key, request.responses)
     
-    # Get AI-enhanced recommendations
-    ai_recommendations = await get_openai_recommendations(request.symptom_key, request.responses)
+    # Get AI-enhanced recommendations. Throttled clients and overload only skip
+    # the LLM call; the rule-based recommendations are always returned
+    llm_outcome = "ok"
+    llm_latency_ms = None
+    headers = None
+    retry_after = await llm_retry_after(http_request, request.session_id)
+    if retry_after > 0:
+        llm_outcome = "throttled"
+        ai_recommendations = AI_UNAVAILABLE_MESSAGE
+        headers = retry_after_headers(retry_after)
+    else:
+        try:
+            async with llm_admission.admit():
+                llm_started = time.perf_counter()
+                ai_recommendations = await get_openai_recommendations(request.symptom_key, request.responses)
+                llm_latency_ms = (time.perf_counter() - llm_started) * 1000
+        except Overloaded as e:
+            llm_outcome = "shed"
+            ai_recommendations = AI_UNAVAILABLE_MESSAGE
+            headers = retry_after_headers(e.retry_after)
+        else:
+            # get_openai_recommendations returns the fallback message itself on failure;
+            # the latency of a failed call would skew LLM latency statistics
+            if ai_recommendations is AI_UNAVAILABLE_MESSAGE:
+                llm_outcome = "error"
+                llm_latency_ms = None
     
-    # Add AI recommendations to the response
-    recommendations_dict = recommendations.model_dump()
-    recommendations_dict["ai_insights"] = ai_recommendations
+    if event_log is not None:
+        event_log.record_assessment(
+            request.symptom_key,
+            request.responses,
+            recommendations.urgency_level,
+            recommendations.is_emergency,
+            llm_outcome,
+            llm_latency_ms
+        )
     
-    return {
-        "session_id": request.session_id,
-        "assessment_complete": True,
-        "recommendations": recommendations_dict
-    }
+    # Add AI recommendations to the response without re-encoding static fragments
+    body = render_assessment(
+        request.session_id,
+        recommendations,
+        ai_recommendations,
+        ai_throttled=llm_outcome in ("throttled", "shed")
+    )
+    return RawJSONResponse(body, headers=headers)
 
 @app.get("/api/session/{session_id}")
 async def get_session(session_id: str):
@@ -609,7 +860,7 @@ async def get_session(session_id: str):
     }
 
 @app.post("/api/analyze-description")
-async def analyze_symptom_description(request: dict):
+async def analyze_symptom_description(request: dict, http_request: Request):
     """Analyze free-form symptom description using AI"""
     try:
         session_id = request.get("session_id")
@@ -621,8 +872,16 @@ async def analyze_symptom_description(request: dict):
         if not description.strip():
             raise HTTPException(status_code=400, detail="No description provided")
         
+        retry_after = await llm_retry_after(http_request, session_id)
+        if retry_after > 0:
+            raise too_many_requests(retry_after)
+        
         # Use AI to analyze the description and suggest symptom category
-        ai_analysis = await analyze_symptom_with_ai(description)
+        try:
+            async with llm_admission.admit():
+                ai_analysis = await analyze_symptom_with_ai(description)
+        except Overloaded as e:
+            raise too_many_requests(e.retry_after)
         
         return {
             "session_id": session_id,
@@ -632,6 +891,8 @@ async def analyze_symptom_description(request: dict):
             "confidence": ai_analysis.get("confidence", 0.0)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error analyzing description: {e}")
         raise HTTPException(status_code=500, detail="Failed to analyze description")
@@ -669,7 +930,7 @@ async def analyze_symptom_with_ai(description: str) -> dict:
         If the description doesn't clearly fit any category, set suggested_category to null.
         """
         
-        response = openai_client.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": "You are a medical AI assistant. You MUST respond with ONLY valid JSON. No additional text or explanation."},
@@ -763,9 +1024,20 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "active_sessions": len(sessions)
+        "active_sessions": len(sessions),
+        "llm_admission": llm_admission.stats(),
+        "event_log": event_log.stats() if event_log is not None else None,
+        "event_loop": loop_monitor.stats() if loop_monitor is not None else None
     }
 
+if DEBUG_ENDPOINTS:
+    @app.get("/api/debug/event-loop")
+    async def event_loop_debug():
+        """Event-loop lag percentiles and the top blocking call sites with stack samples"""
+        if loop_monitor is None:
+            raise HTTPException(status_code=404, detail="Event-loop monitor is disabled")
+        return loop_monitor.stats(limit=20, include_stack=True)
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting Health Symptom Checker API...")
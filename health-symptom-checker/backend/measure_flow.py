@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Measure requests and bytes per assessment flow, before and after the
+round-trip / preflight / compression work
+
+Drives the app in-process (no network, OpenAI stubbed) the way the frontend
+does, including the CORS preflights a browser would send, and counts
+requests and response bytes (headers + body as transferred).
+
+- before: session/create, symptoms, symptoms/{key}, one answer POST per
+  question, then complete. Every call carries a JSON Content-Type, so
+  every call is preflighted; without Access-Control-Max-Age browsers only
+  cache preflights for ~5s. Responses are uncompressed.
+- after: one bootstrap call (a simple request, no preflight), then complete.
+  Preflights are cached for Access-Control-Max-Age and responses are
+  compressed.
+
+Usage:
+    python measure_flow.py [--flows 3] [--think-time 6]
+"""
+
+import argparse
+import os
+
+# Never reach OpenAI or write the event log from here
+os.environ.setdefault("OPENAI_API_KEY", "measure")
+os.environ["EVENT_LOG_DIR"] = ""
+
+from fastapi.testclient import TestClient
+
+import main
+
+ORIGIN = "https://health-symptom-checker.vercel.app"
+DEFAULT_PREFLIGHT_CACHE_SECONDS = 5  # browser default without Access-Control-Max-Age
+SYMPTOM_KEY = "headache"
+RESPONSES = {"severity": "moderate", "onset": "gradual", "symptoms": "nausea"}
+
+STUB_AI_INSIGHTS = "\n".join(
+    f"• Point {i}: rest, stay hydrated, track how your symptoms change and "
+    f"consult a healthcare professional if they persist or worsen."
+    for i in range(12)
+)
+
+
+async def _stub_openai_recommendations(symptom_key, responses):
+    return STUB_AI_INSIGHTS
+
+
+class BrowserModel:
+    """Counts requests and bytes, sending preflights the way a browser would"""
+
+    def __init__(self, client: TestClient, honour_max_age: bool, accept_encoding: str):
+        self.client = client
+        self.honour_max_age = honour_max_age
+        self.accept_encoding = accept_encoding
+        self.clock = 0.0
+        self.preflight_cache = {}
+        self.requests = 0
+        self.preflights = 0
+        self.bytes = 0
+
+    def _count(self, response):
+        self.requests += 1
+        header_bytes = sum(len(k) + len(v) + 4 for k, v in response.headers.raw) + 17
+        self.bytes += header_bytes + int(response.headers.get("content-length", len(response.content)))
+
+    def _preflight(self, method: str, path: str):
+        expires = self.preflight_cache.get((method, path))
+        if expires is not None and expires > self.clock:
+            return
+        response = self.client.options(path, headers={
+            "Origin": ORIGIN,
+            "Access-Control-Request-Method": method,
+            "Access-Control-Request-Headers": "content-type"
+        })
+        assert response.status_code == 200, response.text
+        self.preflights += 1
+        self._count(response)
+        max_age = DEFAULT_PREFLIGHT_CACHE_SECONDS
+        if self.honour_max_age and "access-control-max-age" in response.headers:
+            max_age = int(response.headers["access-control-max-age"])
+        self.preflight_cache[(method, path)] = self.clock + max_age
+
+    def call(self, method: str, path: str, json=None, content_type: bool = True):
+        if content_type:
+            self._preflight(method, path.split("?")[0])
+        headers = {"Origin": ORIGIN, "Accept-Encoding": self.accept_encoding}
+        if content_type:
+            headers["Content-Type"] = "application/json"
+        response = self.client.request(method, path, json=json, headers=headers)
+        assert response.status_code == 200, response.text
+        self._count(response)
+        return response.json()
+
+
+def flow_before(browser: BrowserModel, think_time: float):
+    session_id = browser.call("POST", "/api/session/create")["session_id"]
+    browser.call("GET", "/api/symptoms")
+    browser.call("GET", f"/api/symptoms/{SYMPTOM_KEY}")
+    for question_id, answer in RESPONSES.items():
+        browser.clock += think_time
+        browser.call("POST", "/api/assessment/answer",
+                     json={"session_id": session_id, "question_id": question_id, "answer": answer})
+    browser.call("POST", "/api/assessment/complete",
+                 json={"session_id": session_id, "symptom_key": SYMPTOM_KEY, "responses": RESPONSES})
+
+
+def flow_after(browser: BrowserModel, think_time: float):
+    session_id = browser.call("POST", "/api/session/bootstrap?include_questions=true", content_type=False)["session_id"]
+    browser.clock += think_time * len(RESPONSES)
+    browser.call("POST", "/api/assessment/complete",
+                 json={"session_id": session_id, "symptom_key": SYMPTOM_KEY, "responses": RESPONSES})
+
+
+def measure(flow, honour_max_age: bool, accept_encoding: str, flows: int, think_time: float):
+    with TestClient(main.app) as client:
+        browser = BrowserModel(client, honour_max_age, accept_encoding)
+        per_flow = []
+        for _ in range(flows):
+            before = (browser.requests, browser.preflights, browser.bytes)
+            flow(browser, think_time)
+            browser.clock += think_time
+            per_flow.append((
+                browser.requests - before[0],
+                browser.preflights - before[1],
+                browser.bytes - before[2]
+            ))
+        return per_flow
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Measure requests and bytes per assessment flow")
+    parser.add_argument("--flows", type=int, default=3, help="Consecutive assessments in one browser session")
+    parser.add_argument("--think-time", type=float, default=6.0, help="Seconds the user spends per question")
+    args = parser.parse_args()
+
+    main.get_openai_recommendations = _stub_openai_recommendations
+
+    results = {
+        "before": measure(flow_before, False, "identity", args.flows, args.think_time),
+        "after": measure(flow_after, True, "gzip, deflate, br", args.flows, args.think_time),
+    }
+
+    print(f"{'mode':<8}{'flow':>5}{'requests':>10}{'preflights':>12}{'bytes':>9}")
+    for mode, per_flow in results.items():
+        for i, (requests, preflights, transferred) in enumerate(per_flow, 1):
+            print(f"{mode:<8}{i:>5}{requests:>10}{preflights:>12}{transferred:>9}")
+    for mode, per_flow in results.items():
+        total_requests = sum(r for r, _, _ in per_flow)
+        total_bytes = sum(b for _, _, b in per_flow)
+        print(f"{mode}: {total_requests / len(per_flow):.1f} requests and "
+              f"{total_bytes / len(per_flow):.0f} bytes per flow on average")
+
+
+if __name__ == "__main__":
+    main_cli()
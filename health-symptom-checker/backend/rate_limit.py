@@ -0,0 +1,170 @@
+"""
+Rate limiting and admission control for LLM-backed endpoints
+
+- Token-bucket rate limiting keyed by client (IP, session id). Bucket state
+  lives either in-process or in Redis, so limits hold across gunicorn workers.
+- An admission controller that caps in-flight LLM calls, queues a bounded
+  number of waiters and sheds the rest.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+
+
+class Overloaded(Exception):
+    """Raised when the admission controller sheds a request"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("LLM capacity exceeded")
+        self.retry_after = retry_after
+
+
+class InMemoryTokenBucketStore:
+    """Token buckets held in process memory (one set per worker)"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        """Take one token; return 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        # Least recently used buckets are evicted first
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Refill and take atomically on the Redis server, using its clock so that
+# workers on different hosts agree on elapsed time
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucketStore:
+    """Token buckets shared between workers through Redis"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed") from e
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        """Take one token; return 0 if allowed, else seconds until one is available"""
+        wait = await self._script(keys=[self.prefix + key], args=[rate, capacity])
+        return float(wait)
+
+
+def create_token_bucket_store(redis_url: Optional[str] = None):
+    """Use Redis when configured, otherwise fall back to in-process buckets"""
+    if redis_url:
+        return RedisTokenBucketStore(redis_url)
+    return InMemoryTokenBucketStore()
+
+
+class RateLimiter:
+    """Token-bucket limiter: `per_minute` sustained requests with bursts up to `burst`"""
+
+    def __init__(self, store, name: str, per_minute: float, burst: int):
+        self.store = store
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+
+    async def check(self, key: str) -> float:
+        """Return 0 if `key` may proceed, else the number of seconds to wait"""
+        try:
+            return await self.store.take(f"{self.name}:{key}", self.rate, self.capacity)
+        except Exception as e:
+            # Fail open: a limiter outage must not take the API down with it
+            print(f"Rate limiter error: {e}")
+            return 0.0
+
+
+class AdmissionController:
+    """Caps concurrent LLM calls in this worker.
+
+    Up to `max_in_flight` calls run at once. Further callers wait up to
+    `queue_timeout` seconds, with at most `max_queue` waiting; anything
+    beyond that is shed with Overloaded.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                raise Overloaded(self.queue_timeout)
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                raise Overloaded(self.queue_timeout)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "shed": self.shed,
+            "max_in_flight": self.max_in_flight
+        }
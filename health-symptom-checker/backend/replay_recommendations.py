@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Replay harness for recommendation outputs
+
+Replays a corpus of assessments through detect_emergency and
+generate_recommendations (and, with --llm, get_openai_recommendations
+against a stubbed OpenAI client), diffs the outputs against a baseline
+snapshot and reports throughput and per-item latency percentiles.
+
+The corpus is either the full answer space of SYMPTOM_DATABASE (default),
+a JSONL file of {"symptom_key": ..., "responses": {...}} objects, or an
+event log directory (completed assessments are replayed). Runs offline:
+no OpenAI key or network access is needed.
+
+Usage:
+    python replay_recommendations.py --update-baseline            # record snapshot
+    python replay_recommendations.py                              # diff against it
+    python replay_recommendations.py --fail-on-latency --repeat 5 # also gate on latency
+    python replay_recommendations.py --corpus event_log --workers 8
+
+The baseline records the corpus and --llm / --llm-latency-ms. A run with a
+different --llm setting is refused; against a different corpus only cases
+present in both are compared and latency is not gated.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Never reach OpenAI or write the event log from here
+os.environ.setdefault("OPENAI_API_KEY", "replay")
+os.environ["EVENT_LOG_DIR"] = ""
+
+import main
+
+DEFAULT_BASELINE = "replay_baseline.json"
+
+
+class _StubCompletions:
+    """Deterministic stand-in for openai_client.chat.completions.
+
+    The reply embeds a digest of the prompt, so prompt changes show up as
+    diffs in ai_insights.
+    """
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    async def create(self, model: str, messages: List[dict], **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        digest = hashlib.sha256(json.dumps([model, messages, kwargs], sort_keys=True).encode()).hexdigest()
+        message = type("Message", (), {"content": f"stub:{digest[:16]}"})
+        choice = type("Choice", (), {"message": message})
+        return type("Completion", (), {"choices": [choice]})
+
+
+class _StubClient:
+    def __init__(self, latency_ms: float):
+        self.chat = type("Chat", (), {"completions": _StubCompletions(latency_ms)})
+
+
+# Corpus sources
+
+def enumerate_answer_space(include_unanswered: bool = False) -> List[Tuple[str, Dict[str, str]]]:
+    """Every combination of options for every symptom in SYMPTOM_DATABASE"""
+    cases = []
+    for symptom_key, symptom in main.SYMPTOM_DATABASE.items():
+        choices = []
+        for question in symptom.questions:
+            values = [option.value for option in question.options]
+            if include_unanswered:
+                values.append(None)
+            choices.append([(question.id, value) for value in values])
+        for combination in itertools.product(*choices):
+            cases.append((symptom_key, {qid: value for qid, value in combination if value is not None}))
+    return cases
+
+
+def load_jsonl_corpus(path: str) -> List[Tuple[str, Dict[str, str]]]:
+    cases = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                cases.append((item["symptom_key"], item["responses"]))
+    return cases
+
+
+def load_event_log_corpus(directory: str) -> List[Tuple[str, Dict[str, str]]]:
+    """Completed assessments from the event log (requires numpy)"""
+    from event_log import CODE_OTHER, EVENT_ASSESSMENT, load_columns
+
+    codebook, columns = load_columns(directory, include_active=True)
+    cases = []
+    for row in (columns["event"] == EVENT_ASSESSMENT).nonzero()[0]:
+        symptom_code = columns["symptom"][row]
+        if symptom_code >= CODE_OTHER:
+            continue
+        responses = {}
+        for qid, values in codebook.questions.items():
+            code = columns[f"answer_{qid}"][row]
+            if code < CODE_OTHER:
+                responses[qid] = values[code]
+        cases.append((codebook.symptoms[symptom_code], responses))
+    return cases
+
+
+def corpus_identity(corpus: Optional[str], include_unanswered: bool) -> str:
+    """Describe the corpus a run replayed, so baselines are only compared like for like"""
+    if corpus is None:
+        return "answer_space+unanswered" if include_unanswered else "answer_space"
+    kind = "event_log" if os.path.isdir(corpus) else "jsonl"
+    return f"{kind}:{os.path.normpath(corpus)}"
+
+
+def case_id(symptom_key: str, responses: Dict[str, str]) -> str:
+    return symptom_key + ":" + "&".join(f"{k}={v}" for k, v in sorted(responses.items()))
+
+
+# Replay (runs in worker processes)
+
+def _init_worker(use_llm: bool, llm_latency_ms: float):
+    if use_llm:
+        main.openai_client = _StubClient(llm_latency_ms)
+
+
+def _replay_chunk(args) -> List[Tuple[str, dict, int]]:
+    chunk, use_llm = args
+    loop = asyncio.new_event_loop()
+    results = []
+    try:
+        for symptom_key, responses in chunk:
+            started = time.perf_counter_ns()
+            is_emergency = main.detect_emergency(symptom_key, responses)
+            recommendations = main.generate_recommendations(symptom_key, responses)
+            output = {
+                "is_emergency": is_emergency,
+                "urgency_level": recommendations.urgency_level,
+                "recommendations": recommendations.recommendations,
+                "follow_up_actions": recommendations.follow_up_actions
+            }
+            if use_llm:
+                output["ai_insights"] = loop.run_until_complete(
+                    main.get_openai_recommendations(symptom_key, responses)
+                )
+            elapsed = time.perf_counter_ns() - started
+            results.append((case_id(symptom_key, responses), output, elapsed))
+    finally:
+        loop.close()
+    return results
+
+
+def replay(cases, workers: int, use_llm: bool, llm_latency_ms: float, chunk_size: int):
+    chunks = [(cases[i:i + chunk_size], use_llm) for i in range(0, len(cases), chunk_size)]
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(use_llm, llm_latency_ms)
+        batches = map(_replay_chunk, chunks)
+        results = [item for batch in batches for item in batch]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(use_llm, llm_latency_ms)) as pool:
+            results = [item for batch in pool.map(_replay_chunk, chunks) for item in batch]
+    return results, time.perf_counter() - started
+
+
+# Reporting
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_latency(results, wall_seconds: float) -> Dict[str, float]:
+    latencies_us = sorted(elapsed / 1000 for _, _, elapsed in results)
+    return {
+        "items": len(results),
+        "throughput_per_s": len(results) / wall_seconds if wall_seconds else 0.0,
+        "p50_us": percentile(latencies_us, 0.50),
+        "p90_us": percentile(latencies_us, 0.90),
+        "p99_us": percentile(latencies_us, 0.99),
+        "max_us": latencies_us[-1] if latencies_us else 0.0
+    }
+
+
+def best_of(summaries: List[Dict[str, float]]) -> Dict[str, float]:
+    """Combine repeated runs: lowest latency and highest throughput seen for each metric.
+
+    Noise (scheduling, CPU frequency, cache warm-up) only ever makes a run
+    slower, so the best run is the most stable estimate.
+    """
+    best = dict(summaries[0])
+    for summary in summaries[1:]:
+        for key, value in summary.items():
+            if key == "throughput_per_s":
+                best[key] = max(best[key], value)
+            elif key != "items":
+                best[key] = min(best[key], value)
+    best["runs"] = len(summaries)
+    return best
+
+
+def diff_outputs(baseline: Dict[str, dict], current: Dict[str, dict], show: int, same_corpus: bool = True) -> int:
+    """Print output differences and return how many should fail the run.
+
+    New and missing cases only count when the baseline replayed the same
+    corpus; otherwise they are expected and only cases in both are compared.
+    """
+    added = sorted(set(current) - set(baseline))
+    removed = sorted(set(baseline) - set(current))
+    changed = sorted(k for k in set(current) & set(baseline) if current[k] != baseline[k])
+
+    print(f"Outputs: {len(changed)} changed, {len(added)} new, {len(removed)} missing "
+          f"(of {len(current)} replayed, {len(baseline)} in baseline)")
+    for key in changed[:show]:
+        print(f"  ~ {key}")
+        for field in sorted(set(baseline[key]) | set(current[key])):
+            if baseline[key].get(field) != current[key].get(field):
+                print(f"      {field}: {json.dumps(baseline[key].get(field), ensure_ascii=False)}")
+                print(f"      {' ' * len(field)}  -> {json.dumps(current[key].get(field), ensure_ascii=False)}")
+    for key in added[:show]:
+        print(f"  + {key}")
+    for key in removed[:show]:
+        print(f"  - {key}")
+    if max(len(changed), len(added), len(removed)) > show:
+        print(f"  ... (showing at most {show} of each, use --show to see more)")
+    if not same_corpus:
+        return len(changed)
+    return len(changed) + len(added) + len(removed)
+
+
+def compare_latency(
+    baseline: Optional[Dict[str, float]],
+    current: Dict[str, float],
+    tolerance: float,
+    floor_us: float
+) -> bool:
+    """Print latency against the baseline; return True if p50 or p99 regressed.
+
+    A regression must exceed both the relative tolerance and the absolute
+    floor, so jitter of a few µs on µs-scale items is not reported.
+    """
+    print(f"Latency (best of {current.get('runs', 1)}): {current['items']} items, "
+          f"{current['throughput_per_s']:.0f} items/s, "
+          f"p50 {current['p50_us']:.1f}µs, p90 {current['p90_us']:.1f}µs, "
+          f"p99 {current['p99_us']:.1f}µs, max {current['max_us']:.1f}µs")
+    if not baseline:
+        return False
+
+    regressed = False
+    for key in ("p50_us", "p99_us"):
+        before, after = baseline[key], current[key]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if after - before > max(tolerance * before, floor_us):
+            regressed = True
+            flag = "  REGRESSION"
+        print(f"  {key}: {before:.1f} -> {after:.1f} ({change:+.0%}){flag}")
+    return regressed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Replay assessments and diff recommendation outputs")
+    parser.add_argument("--corpus", help="JSONL file or event log directory (default: full answer space)")
+    parser.add_argument("--include-unanswered", action="store_true",
+                        help="When enumerating, also leave each question unanswered")
+    parser.add_argument("--llm", action="store_true", help="Also replay get_openai_recommendations with a stub client")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated stub LLM latency")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Replay the corpus this many times; latency is the best of these runs")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write the current outputs as the baseline")
+    parser.add_argument("--fail-on-latency", action="store_true",
+                        help="Also exit 1 on a latency regression (by default only output diffs fail)")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25,
+                        help="Allowed relative p50/p99 increase before reporting a regression")
+    parser.add_argument("--latency-floor-us", type=float, default=20.0,
+                        help="Allowed absolute p50/p99 increase in µs before reporting a regression")
+    parser.add_argument("--show", type=int, default=20, help="Max differences to print per kind")
+    args = parser.parse_args()
+
+    corpus = corpus_identity(args.corpus, args.include_unanswered)
+    if args.corpus is None:
+        cases = enumerate_answer_space(args.include_unanswered)
+    elif os.path.isdir(args.corpus):
+        cases = load_event_log_corpus(args.corpus)
+    else:
+        cases = load_jsonl_corpus(args.corpus)
+    summaries = []
+    outputs = None
+    for _ in range(max(1, args.repeat)):
+        results, wall_seconds = replay(cases, max(1, args.workers), args.llm, args.llm_latency_ms, args.chunk_size)
+        summaries.append(summarize_latency(results, wall_seconds))
+        if outputs is None:
+            outputs = {key: output for key, output, _ in results}
+    latency = best_of(summaries)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "corpus": corpus,
+                    "llm": args.llm,
+                    "llm_latency_ms": args.llm_latency_ms,
+                    "latency": latency,
+                    "outputs": outputs
+                },
+                f, ensure_ascii=False, indent=1, sort_keys=True
+            )
+        compare_latency(None, latency, args.latency_tolerance, args.latency_floor_us)
+        print(f"Wrote baseline with {len(outputs)} outputs to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        compare_latency(None, latency, args.latency_tolerance, args.latency_floor_us)
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if "llm" not in baseline:
+        print(f"Baseline {args.baseline} does not record its settings; re-run with --update-baseline")
+        return 2
+    if baseline["llm"] != args.llm:
+        # Every ai_insights field would differ; the comparison is meaningless
+        print(f"Baseline was recorded {'with' if baseline['llm'] else 'without'} --llm; "
+              f"run with the same flag or re-record it")
+        return 2
+
+    same_corpus = baseline["corpus"] == corpus
+    if not same_corpus:
+        print(f"Warning: baseline replayed {baseline['corpus']}, this run replayed {corpus}; "
+              f"comparing only cases present in both, and skipping the latency comparison")
+    differences = diff_outputs(baseline["outputs"], outputs, args.show, same_corpus)
+
+    baseline_latency = baseline.get("latency")
+    if not same_corpus:
+        baseline_latency = None
+    elif baseline["llm_latency_ms"] != args.llm_latency_ms:
+        print(f"Warning: baseline used --llm-latency-ms {baseline['llm_latency_ms']:g}; "
+              f"skipping the latency comparison")
+        baseline_latency = None
+    regressed = compare_latency(baseline_latency, latency, args.latency_tolerance, args.latency_floor_us)
+    if regressed and not args.fail_on_latency:
+        print("Latency regression reported only; pass --fail-on-latency to fail on it")
+    return 1 if differences or (regressed and args.fail_on_latency) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,40 @@
+"""
+Response serialization helpers for the Health Symptom Checker API
+
+Static parts of responses are encoded once with orjson and spliced into
+response bodies as raw bytes, so hot paths never re-encode them.
+"""
+
+from typing import Any, Dict, Iterable
+import orjson
+from fastapi.responses import Response
+
+
+def encode(value: Any) -> bytes:
+    """Encode a value to compact UTF-8 JSON bytes"""
+    return orjson.dumps(value)
+
+
+def encode_items(values: Iterable[Any]) -> bytes:
+    """Encode values as comma-separated JSON array members (no brackets)"""
+    return b",".join(orjson.dumps(value) for value in values)
+
+
+def encode_list(values: Iterable[Any], tail: bytes = b"") -> bytes:
+    """Encode a JSON array, appending pre-encoded members from `tail` unchanged"""
+    head = encode_items(values)
+    if head and tail:
+        return b"[" + head + b"," + tail + b"]"
+    return b"[" + (head or tail) + b"]"
+
+
+def open_object(value: Dict) -> bytes:
+    """Encode a dict as a JSON object with its closing brace left off,
+    so further members can be appended before closing it with b"}"
+    """
+    return orjson.dumps(value)[:-1]
+
+
+class RawJSONResponse(Response):
+    """Response for bodies that are already encoded JSON bytes"""
+    media_type = "application/json"
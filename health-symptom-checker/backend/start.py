@@ -4,20 +4,41 @@ Health Symptom Checker Backend Startup Script
 """
 
 import uvicorn
-from config import API_HOST, API_PORT
+from config import API_HOST, API_PORT, SERVER, KEEP_ALIVE_TIMEOUT, SSL_CERTFILE, SSL_KEYFILE
+
+def run_hypercorn():
+    """Serve over HTTP/2 (ALPN when TLS is configured, h2c otherwise) with long keep-alive"""
+    import asyncio
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+    from main import app
+
+    config = Config()
+    config.bind = [f"{API_HOST}:{API_PORT}"]
+    config.keep_alive_timeout = KEEP_ALIVE_TIMEOUT
+    config.alpn_protocols = ["h2", "http/1.1"]
+    if SSL_CERTFILE and SSL_KEYFILE:
+        config.certfile = SSL_CERTFILE
+        config.keyfile = SSL_KEYFILE
+    asyncio.run(serve(app, config))
 
 if __name__ == "__main__":
     print("🚀 Starting Health Symptom Checker API...")
     print("🤖 OpenAI Integration: Enabled")
     print(f"📊 API Documentation: http://{API_HOST}:{API_PORT}/docs")
     print(f"🩺 Health Check: http://{API_HOST}:{API_PORT}/api/health")
+    print(f"🌐 Server: {SERVER} (keep-alive {KEEP_ALIVE_TIMEOUT}s)")
     print("⚠️  Remember: This is for educational purposes only!")
     print("=" * 60)
     
-    uvicorn.run(
-        "main:app",
-        host=API_HOST,
-        port=API_PORT,
-        reload=True,
-        log_level="info"
-    )
+    if SERVER == "hypercorn":
+        run_hypercorn()
+    else:
+        uvicorn.run(
+            "main:app",
+            host=API_HOST,
+            port=API_PORT,
+            reload=True,
+            timeout_keep_alive=KEEP_ALIVE_TIMEOUT,
+            log_level="info"
+        )
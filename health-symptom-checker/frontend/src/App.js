@@ -10,6 +10,7 @@ const HealthSymptomChecker = () => {
   const [sessionId, setSessionId] = useState(null);
   const [currentSymptom, setCurrentSymptom] = useState(null);
   const [availableSymptoms, setAvailableSymptoms] = useState([]);
+  const [symptomQuestions, setSymptomQuestions] = useState({});
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
   const [isLoading, setIsLoading] = useState(false);
   const [isWaitingForDescription, setIsWaitingForDescription] = useState(false);
@@ -29,14 +30,12 @@ const HealthSymptomChecker = () => {
   // API Functions
   const apiCall = async (endpoint, method = 'GET', data = null) => {
     try {
-      const config = {
-        method,
-        headers: {
-          'Content-Type': 'application/json',
-        },
-      };
+      const config = { method };
       
+      // Only requests with a JSON body send Content-Type, so GETs and the
+      // body-less bootstrap POST are simple requests that skip CORS preflight
       if (data) {
+        config.headers = { 'Content-Type': 'application/json' };
         config.body = JSON.stringify(data);
       }
       
@@ -65,16 +64,24 @@ const HealthSymptomChecker = () => {
     }
   };
 
-  const loadSymptoms = async () => {
+  // Create the session and load the symptom catalog with every category's questions in one round-trip
+  const bootstrapSession = async () => {
     try {
-      const response = await apiCall('/api/symptoms');
+      const response = await apiCall('/api/session/bootstrap?include_questions=true', 'POST');
+      setSessionId(response.session_id);
       setAvailableSymptoms(response.symptoms);
+      setSymptomQuestions(response.questions || {});
+      return response.session_id;
     } catch (error) {
-      console.error('Failed to load symptoms:', error);
+      console.error('Failed to bootstrap session:', error);
+      return null;
     }
   };
 
   const loadSymptomQuestions = async (symptomKey) => {
+    if (symptomQuestions[symptomKey]) {
+      return symptomQuestions[symptomKey];
+    }
     try {
       const response = await apiCall(`/api/symptoms/${symptomKey}`);
       return response;
@@ -84,18 +91,6 @@ const HealthSymptomChecker = () => {
     }
   };
 
-  const submitAnswer = async (questionId, answer) => {
-    try {
-      await apiCall('/api/assessment/answer', 'POST', {
-        session_id: sessionId,
-        question_id: questionId,
-        answer: answer
-      });
-    } catch (error) {
-      console.error('Failed to submit answer:', error);
-    }
-  };
-
   const completeAssessment = async (symptomKey, responses) => {
     try {
       const response = await apiCall('/api/assessment/complete', 'POST', {
@@ -130,17 +125,14 @@ const HealthSymptomChecker = () => {
   };
 
   const handleWelcome = async () => {
-    // Initialize session
+    // Initialize session and load available symptoms
     setIsLoading(true);
-    const newSessionId = await createSession();
+    const newSessionId = await bootstrapSession();
     if (!newSessionId) {
       addMessage("⚠️ Unable to start session. Please make sure the Python backend is running and refresh the page.", true);
       setIsLoading(false);
       return;
     }
-    
-    // Load available symptoms
-    await loadSymptoms();
     setIsLoading(false);
     
     await addTypingMessage("Hello! I'm your Health Symptom Assistant. 🩺");
@@ -244,7 +236,7 @@ const HealthSymptomChecker = () => {
     }
   };
 
-  const handleQuestionFlow = async (symptomKey) => {
+  const handleQuestionFlow = async (symptomKey, responses = userResponses) => {
     if (currentQuestionIndex === 0) {
       // Load symptom questions from API
       const symptomData = await loadSymptomQuestions(symptomKey);
@@ -257,7 +249,7 @@ const HealthSymptomChecker = () => {
 
     if (!currentSymptom || currentQuestionIndex >= currentSymptom.questions.length) {
       // All questions answered, complete assessment
-      await completeSymptomAssessment(symptomKey);
+      await completeSymptomAssessment(symptomKey, responses);
       return;
     }
 
@@ -266,10 +258,10 @@ const HealthSymptomChecker = () => {
     addMessage("", true, question.options);
   };
 
-  const completeSymptomAssessment = async (symptomKey) => {
+  const completeSymptomAssessment = async (symptomKey, responses) => {
     setIsLoading(true);
     
-    const recommendations = await completeAssessment(symptomKey, userResponses);
+    const recommendations = await completeAssessment(symptomKey, responses);
     
     if (!recommendations) {
       addMessage("⚠️ Unable to generate recommendations. Please consult with a healthcare professional.", true);
@@ -294,7 +286,9 @@ const HealthSymptomChecker = () => {
     }
 
     // Display AI insights if available
-    if (recommendations.ai_insights) {
+    if (recommendations.ai_throttled) {
+      await addTypingMessage("🤖 AI-Enhanced Insights are busy right now. Please try again in a moment.", 1500);
+    } else if (recommendations.ai_insights) {
       await addTypingMessage("🤖 AI-Enhanced Insights:", 1500);
       await addTypingMessage(recommendations.ai_insights, 2000);
     }
@@ -361,10 +355,9 @@ const HealthSymptomChecker = () => {
         break;
 
       case 'assessment':
-        // Submit answer to API
+        // Answers are kept client-side and sent together with /api/assessment/complete
         if (currentSymptom && currentQuestionIndex < currentSymptom.questions.length) {
           const currentQuestion = currentSymptom.questions[currentQuestionIndex];
-          await submitAnswer(currentQuestion.id, value);
           
           // Update local responses
           const newResponses = { ...userResponses, [currentQuestion.id]: value };
@@ -382,7 +375,7 @@ const HealthSymptomChecker = () => {
           
           // Continue with next question or complete assessment
           const symptomKey = availableSymptoms.find(s => s.name === currentSymptom.name)?.key;
-          await handleQuestionFlow(symptomKey);
+          await handleQuestionFlow(symptomKey, newResponses);
         }
         break;
 